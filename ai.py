@@ -1,14 +1,53 @@
 import copy
+from functools import lru_cache
 from typing import List, Tuple, Optional
 import numpy as np
 from blockblast import BlockBlast, SCREEN, FPS, BG_COLOR
 import pygame
 from itertools import permutations
+from profiler import Profiler
+from evaluator import HeuristicEvaluator, MLPEvaluator
+
+FEATURE_NAMES = [
+    "combo",
+    "combo_lost",
+    "clear_potential",
+    "density",
+    "edge_utilization",
+    "future_viability",
+    "complete_clear",
+    "clumping",
+]
+
+
+@lru_cache(maxsize=1 << 16)
+def max_filled_rect(rows):
+    """Area of the largest all-filled rectangle, rows are occupancy bitmasks
+
+    AND-ing the masks of rows top..bottom leaves the columns filled in all of
+    them; the longest run of set bits times the height is the best rectangle
+    spanning exactly those rows.
+    """
+    best = 0
+    for top in range(len(rows)):
+        mask = -1
+        for bottom in range(top, len(rows)):
+            mask &= rows[bottom]
+            if not mask:
+                break
+            # longest run of set bits: each shift-AND shortens every run by one
+            run, m = 0, mask
+            while m:
+                m &= m >> 1
+                run += 1
+            best = max(best, run * (bottom - top + 1))
+    return best
 
 
 class BlockBlastAI:
-    def __init__(self, game: BlockBlast):
+    def __init__(self, game: BlockBlast, evaluator=None):
         self.game = game
+        self.evaluator = evaluator if evaluator is not None else HeuristicEvaluator()
         self.weights = {
             "combo_multiplier": 5,
             "clear_bonus": 30,
@@ -56,6 +95,20 @@ class BlockBlastAI:
         score += clumping
         return score
 
+    def get_features(self, grid, combo, since_clear):
+        """Raw heuristic terms of evaluate_board_state, in FEATURE_NAMES order"""
+        combo_lost = since_clear >= 3
+        return [
+            0 if combo_lost else combo,
+            1 if combo_lost else 0,
+            self.analyze_clear_potential(grid),
+            self.calculate_density(grid),
+            self.calculate_edge_utilization(grid),
+            self.calculate_future_viability(grid),
+            1 if self.game.all_clear(grid) else 0,
+            self.calculate_clumping_score(grid),
+        ]
+
     def analyze_clear_potential(self, grid):
         """Analyzes potential for clearing multiple lines"""
         potential = 0
@@ -124,30 +177,11 @@ class BlockBlastAI:
 
     def calculate_clumping_score(self, grid):
         """Rewards blocks clumped together in rectangles to enable multi-row/col clears"""
-
-        def maxrect(bars):
-            stack = []
-            res = 0
-            for bar in bars + [-1]:
-
-                steps = 0
-                while stack and stack[-1][1] >= bar:
-                    w, h = stack.pop()
-                    steps += w
-                    res = max(res, h * steps)
-                stack.append((steps + 1, bar))
-
-            return res
-
-        histo = [0] * self.game.grid_size
-        max_rect = 0
-        for i in range(self.game.grid_size):
-            for j in range(self.game.grid_size):
-                if grid[i][j] == self.game.grid_bg_colour:
-                    histo[j] = 0
-                else:
-                    histo[j] += 1
-            max_rect = max(maxrect(histo), max_rect)
+        bg = self.game.grid_bg_colour
+        rows = tuple(
+            sum(1 << j for j, cell in enumerate(row) if cell != bg) for row in grid
+        )
+        max_rect = max_filled_rect(rows)
 
         clumping_score = 0
         if max_rect > 1:
@@ -164,39 +198,59 @@ class BlockBlastAI:
         temp_since_clear = self.game.since_clear
 
         for block_i, (block, colour) in move_sequence:
-            best_move_score = float("-inf")
-            best_position = None
-            best_resulting_grid = None
-            best_combo_state = None
+            positions = []
+            grids = []
+            immediate_scores = []
+            combos = []
+            since_clears = []
 
             # Try all positions for this block
             for row in range(self.game.grid_size):
                 for col in range(self.game.grid_size):
                     if self.game.can_place_block(current_grid, block, row, col):
-                        # Calculate score for this placement
                         grid = copy.deepcopy(current_grid)
-                        move_score, new_combo, new_since_clear = self.evaluate_move(
+                        immediate_score, new_combo, new_since_clear = self.simulate_move(
                             grid, block, colour, row, col, temp_combo, temp_since_clear
                         )
-                        if move_score > best_move_score:
-                            best_move_score = move_score
-                            best_position = (row, col)
-                            best_resulting_grid = grid
-                            best_combo_state = (new_combo, new_since_clear)
+                        positions.append((row, col))
+                        grids.append(grid)
+                        immediate_scores.append(immediate_score)
+                        combos.append(new_combo)
+                        since_clears.append(new_since_clear)
 
             # If no valid position found i.e game over, return very low score
-            if best_position is None:
+            if not positions:
                 return -10000, []
 
+            # Score every resulting board in one evaluator call
+            state_scores = self.evaluator.evaluate_batch(
+                self, grids, combos, since_clears
+            )
+            move_scores = [i + s for i, s in zip(immediate_scores, state_scores)]
+            best = max(range(len(positions)), key=lambda k: move_scores[k])
+
             # Add this move to sequence
-            move_seq.append((block_i, best_position[0], best_position[1]))
-            total_score += best_move_score
-            current_grid = best_resulting_grid
-            temp_combo, temp_since_clear = best_combo_state
+            move_seq.append((block_i, positions[best][0], positions[best][1]))
+            total_score += move_scores[best]
+            current_grid = grids[best]
+            temp_combo, temp_since_clear = combos[best], since_clears[best]
         return total_score, move_seq
 
     def evaluate_move(self, grid, block, colour, row, col, combo, since_cleared):
         """Evaluate a specific move with lookahead"""
+        immediate_score, new_combo, new_since_clear = self.simulate_move(
+            grid, block, colour, row, col, combo, since_cleared
+        )
+
+        # Evaluate board state
+        [state_score] = self.evaluator.evaluate_batch(
+            self, [grid], [new_combo], [new_since_clear]
+        )
+
+        return immediate_score + state_score, new_combo, new_since_clear
+
+    def simulate_move(self, grid, block, colour, row, col, combo, since_cleared):
+        """Place and clear on grid, returns (immediate score, new combo, new since_clear)"""
         # Simulate placement
         self.simulate_placement(grid, block, row, col, colour)
         lines_cleared = self.simulate_clear(grid)
@@ -223,10 +277,7 @@ class BlockBlastAI:
         if all(cell == self.game.grid_bg_colour for row in grid for cell in row):
             immediate_score += 300
 
-        # Evaluate board state
-        state_score = self.evaluate_board_state(grid, new_combo, new_since_clear)
-
-        return immediate_score + state_score, new_combo, new_since_clear
+        return immediate_score, new_combo, new_since_clear
 
     def simulate_placement(self, grid, block, top, left, colour):
         """Simulate placing a block and return new grid state"""
@@ -251,11 +302,14 @@ class BlockBlastAI:
 
 # Integration with the main game
 class AIBlockBlast(BlockBlast):
-    def __init__(self):
+    def __init__(self, profiler=None, evaluator=None, search=True):
         super().__init__()
-        self.ai = BlockBlastAI(self)
+        self.ai = BlockBlastAI(self, evaluator)
+        if profiler is not None:
+            profiler.attach(self.ai)
         self.auto_play = False
-        self.moves = self.ai.find_best_move_sequence()
+        # search=False leaves moves empty for a caller that restores them (snapshots)
+        self.moves = self.ai.find_best_move_sequence() if search else []
 
     def ai_make_move(self):
         """Have AI make the best move"""
@@ -281,10 +335,12 @@ class AIBlockBlast(BlockBlast):
 
 
 # Modified main loop for AI
-def main_ai():
+def main_ai(profile=False, weights=None):
     run = True
     clock = pygame.time.Clock()
-    block_blast = AIBlockBlast()
+    profiler = Profiler() if profile else None
+    evaluator = MLPEvaluator.load(weights) if weights else None
+    block_blast = AIBlockBlast(profiler, evaluator)
     gameover = False
 
     while run:
@@ -312,6 +368,12 @@ def main_ai():
         pygame.display.flip()
         clock.tick(FPS)
 
+    if profiler is not None:
+        profiler.dump_json("profile.json")
+        profiler.dump_folded("profile.folded")
+        print(profiler.summary())
+        print("Profile written to profile.json and profile.folded")
+
 
 if __name__ == "__main__":
     main_ai()  # Run AI version
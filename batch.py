@@ -0,0 +1,199 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import random
+import struct
+import time
+import snapshot
+from ai import AIBlockBlast
+from evaluator import HeuristicEvaluator, MLPEvaluator
+
+
+CHECKPOINT = struct.Struct("<4sqi32sIIId?")  # see save_checkpoint
+CHECKPOINT_MAGIC = b"BBC2"
+
+
+def play_game(seed, max_turns=None, profiler=None, on_move=None, evaluator=None):
+    """Play one AI game without drawing, returns (score, turns)
+
+    A turn is one full tray of three blocks. The game ends when the remaining
+    blocks cannot be placed or the AI finds no sequence for the tray.
+    on_move(game) is called before each block is placed.
+    """
+    random.seed(seed)
+    game = AIBlockBlast(profiler, evaluator)
+    return continue_game(game, 0, max_turns, on_move)
+
+
+def continue_game(game, turns, max_turns=None, on_move=None, on_turn=None):
+    """Play game on from `turns` completed turns, returns (score, turns)
+
+    on_turn(game, turns) is called at every tray boundary the game goes on from.
+    """
+    while game.moves:
+        if on_move is not None:
+            on_move(game)
+        game.ai_make_move()
+        if game.is_game_over(game.grid):
+            break
+        if not any(game.placed_preview):  # tray was refilled
+            turns += 1
+            if max_turns is not None and turns >= max_turns:
+                break
+            if on_turn is not None:
+                on_turn(game, turns)
+    return game.score, turns
+
+
+def save_checkpoint(
+    path, seed, max_turns, evaluator, scores, decisions, elapsed, game=None, turns=0
+):
+    """Atomically writes run progress and, if a game is in progress, its snapshot
+
+    Layout: header (magic, seed, max_turns or -1, evaluator fingerprint,
+    completed games, turns of the game in progress, decisions, elapsed
+    seconds, has game), completed scores as int64, then the snapshot record of
+    the game in progress.
+    """
+    data = CHECKPOINT.pack(
+        CHECKPOINT_MAGIC,
+        seed,
+        -1 if max_turns is None else max_turns,
+        evaluator.fingerprint(),
+        len(scores),
+        turns,
+        decisions,
+        elapsed,
+        game is not None,
+    )
+    data += struct.pack(f"<{len(scores)}q", *scores)
+    if game is not None:
+        data += snapshot.serialize(game)
+    snapshot.write_atomic(path, data)
+
+
+def load_checkpoint(path, seed, max_turns, evaluator):
+    """Returns (scores, decisions, elapsed, snapshot record or None, turns)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != CHECKPOINT_MAGIC:
+        raise ValueError(f"{path} is not a batch checkpoint")
+    (
+        _, saved_seed, saved_max_turns, saved_evaluator,
+        n, turns, decisions, elapsed, has_game,
+    ) = CHECKPOINT.unpack_from(data)
+    if (saved_seed, saved_max_turns) != (seed, -1 if max_turns is None else max_turns):
+        raise ValueError(
+            f"{path} was written with --seed {saved_seed} --max-turns {saved_max_turns}"
+        )
+    if saved_evaluator != evaluator.fingerprint():
+        raise ValueError(f"{path} was written with a different evaluator (--weights)")
+    offset = CHECKPOINT.size
+    scores = list(struct.unpack_from(f"<{n}q", data, offset))
+    offset += 8 * n
+    record = data[offset : offset + snapshot.RECORD.size] if has_game else None
+    return scores, decisions, elapsed, record, turns
+
+
+def run_games(
+    games, seed, max_turns=None, evaluator=None, label="",
+    checkpoint=None, checkpoint_every=10,
+):
+    """Returns (mean score, ms per decision)
+
+    With a checkpoint path, progress is saved every checkpoint_every turns and
+    after each game, and an existing checkpoint is resumed from. A resumed run
+    gives the same scores as an uninterrupted one.
+    """
+    if evaluator is None:
+        evaluator = HeuristicEvaluator()
+    scores = []
+    decisions = 0
+    elapsed = 0.0
+    record = None
+    turns = 0
+    if checkpoint is not None and os.path.exists(checkpoint):
+        scores, decisions, elapsed, record, turns = load_checkpoint(
+            checkpoint, seed, max_turns, evaluator
+        )
+        print(f"{label}resuming at game {len(scores)}, turn {turns}")
+    start = time.perf_counter() - elapsed
+
+    def on_turn(game, turns):
+        if turns % checkpoint_every == 0:
+            save_checkpoint(
+                checkpoint, seed, max_turns, evaluator, scores, decisions,
+                time.perf_counter() - start, game, turns,
+            )
+
+    for i in range(len(scores), games):
+        if record is not None:
+            game = AIBlockBlast(evaluator=evaluator, search=False)
+            snapshot.deserialize(game, record)
+            record = None
+        else:
+            random.seed(seed + i)
+            game = AIBlockBlast(evaluator=evaluator)
+            turns = 0
+        score, turns = continue_game(
+            game, turns, max_turns, on_turn=on_turn if checkpoint else None
+        )
+        scores.append(score)
+        decisions += turns + 1  # one search per tray, including the first
+        print(f"{label}game {i} (seed {seed + i}): score {score}, turns {turns}")
+        if checkpoint is not None:
+            save_checkpoint(
+                checkpoint, seed, max_turns, evaluator, scores, decisions,
+                time.perf_counter() - start,
+            )
+    elapsed = time.perf_counter() - start
+
+    if checkpoint is not None:
+        os.remove(checkpoint)
+    return sum(scores) / max(len(scores), 1), elapsed * 1000 / max(decisions, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless AI games")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-turns", type=int, default=None)
+    parser.add_argument("--weights", help="play with an MLPEvaluator loaded from this file")
+    parser.add_argument(
+        "--compare", action="store_true",
+        help="also play the same seeds with the handcrafted heuristics",
+    )
+    parser.add_argument(
+        "--checkpoint", metavar="PATH",
+        help="save progress here and resume from it if it exists",
+    )
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="turns between checkpoints")
+    args = parser.parse_args()
+    if args.checkpoint and args.compare:
+        parser.error("--checkpoint cannot be combined with --compare")
+
+    runs = []
+    if args.weights is None or args.compare:
+        runs.append(("heuristic", HeuristicEvaluator()))
+    if args.weights is not None:
+        runs.append((args.weights, MLPEvaluator.load(args.weights)))
+
+    results = []
+    for name, evaluator in runs:
+        label = f"[{name}] " if len(runs) > 1 else ""
+        results.append(
+            (name,)
+            + run_games(
+                args.games, args.seed, args.max_turns, evaluator, label,
+                args.checkpoint, args.checkpoint_every,
+            )
+        )
+
+    for name, mean_score, ms in results:
+        print(f"{name}: mean score {mean_score:.1f}, {ms:.1f} ms/decision")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import time
+import timeit
+from ai import BlockBlastAI, max_filled_rect
+from batch import play_game
+from blockblast import BlockBlast
+
+BASELINE_PATH = "benchmark_baseline.json"
+
+
+########################################################################
+# CORPUS
+
+
+def make_position(seed, placements=12):
+    """Build a mid-game position by placing random blocks at random valid spots"""
+    random.seed(seed)
+    game = BlockBlast()
+    for _ in range(placements):
+        block, colour = random.choice(game.current_blocks)
+        spots = [
+            (r, c)
+            for r in range(game.grid_size)
+            for c in range(game.grid_size)
+            if game.can_place_block(game.grid, block, r, c)
+        ]
+        if not spots:
+            break
+        r, c = random.choice(spots)
+        game.place_block(game.grid, block, r, c, colour)
+        game.score += game.get_score_increment(
+            game.grid, block, game.clear(game.grid)
+        )
+        game.current_blocks = game.get_preview_blocks()
+        while game.is_game_over(game.grid):
+            game.current_blocks = game.get_preview_special_blocks()
+    return game
+
+
+def make_corpus(size):
+    return [make_position(seed) for seed in range(size)]
+
+
+########################################################################
+# BENCHMARKS
+# Each benchmark returns (fn, ops): fn runs `ops` operations over the corpus
+
+
+def bench_can_place_block(corpus):
+    calls = [
+        (game, game.grid, game.current_blocks[0][0], r, c)
+        for game in corpus
+        for r in range(game.grid_size)
+        for c in range(game.grid_size)
+    ]
+
+    def fn():
+        for game, grid, block, r, c in calls:
+            game.can_place_block(grid, block, r, c)
+
+    return fn, len(calls)
+
+
+def bench_place_block(corpus):
+    calls = []
+    for game in corpus:
+        block, colour = game.current_blocks[0]
+        spots = [
+            (r, c)
+            for r in range(game.grid_size)
+            for c in range(game.grid_size)
+            if game.can_place_block(game.grid, block, r, c)
+        ]
+        # placing the same block again is idempotent on the scratch grid
+        for r, c in spots[:1]:
+            calls.append((game, game.get_deepcopy(), block, r, c, colour))
+
+    def fn():
+        for game, grid, block, r, c, colour in calls:
+            game.place_block(grid, block, r, c, colour)
+
+    return fn, len(calls)
+
+
+def bench_clear(corpus):
+    # corpus boards have no full lines, so this measures the scan without mutating
+    def fn():
+        for game in corpus:
+            game.clear(game.grid)
+
+    return fn, len(corpus)
+
+
+def bench_is_game_over(corpus):
+    def fn():
+        for game in corpus:
+            game.is_game_over(game.grid)
+
+    return fn, len(corpus)
+
+
+def make_heuristic_bench(name):
+    def bench(corpus):
+        calls = [(getattr(BlockBlastAI(game), name), game.grid) for game in corpus]
+
+        def fn():
+            for heuristic, grid in calls:
+                heuristic(grid)
+
+        return fn, len(calls)
+
+    return bench
+
+
+def bench_clumping_score(corpus):
+    # clear the occupancy memo each call, otherwise the fixed corpus only
+    # measures cache hits and never runs max_filled_rect
+    calls = [(BlockBlastAI(game), game.grid) for game in corpus]
+
+    def fn():
+        for ai, grid in calls:
+            max_filled_rect.cache_clear()
+            ai.calculate_clumping_score(grid)
+
+    return fn, len(calls)
+
+
+def bench_evaluate_board_state(corpus):
+    calls = [(BlockBlastAI(game), game) for game in corpus]
+
+    def fn():
+        for ai, game in calls:
+            ai.evaluate_board_state(game.grid, game.combo, game.since_clear)
+
+    return fn, len(calls)
+
+
+def bench_evaluate_move_sequence(corpus):
+    calls = [(BlockBlastAI(game), list(enumerate(game.current_blocks))) for game in corpus]
+
+    def fn():
+        for ai, seq in calls:
+            ai.evaluate_move_sequence(seq)
+
+    return fn, len(calls)
+
+
+def bench_find_best_move_sequence(corpus):
+    ais = [BlockBlastAI(game) for game in corpus]
+
+    def fn():
+        for ai in ais:
+            ai.find_best_move_sequence()
+
+    return fn, len(ais)
+
+
+MICRO = {
+    "can_place_block": bench_can_place_block,
+    "place_block": bench_place_block,
+    "clear": bench_clear,
+    "is_game_over": bench_is_game_over,
+    "analyze_clear_potential": make_heuristic_bench("analyze_clear_potential"),
+    "calculate_density": make_heuristic_bench("calculate_density"),
+    "calculate_edge_utilization": make_heuristic_bench("calculate_edge_utilization"),
+    "calculate_future_viability": make_heuristic_bench("calculate_future_viability"),
+    "calculate_clumping_score": bench_clumping_score,
+    "evaluate_board_state": bench_evaluate_board_state,
+}
+
+MACRO = {
+    "evaluate_move_sequence": bench_evaluate_move_sequence,
+    "find_best_move_sequence": bench_find_best_move_sequence,
+}
+
+
+def time_micro(fn, ops, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / (number * ops)
+
+
+def time_macro(fn, ops, repeat):
+    return min(timeit.Timer(fn).repeat(repeat, 1)) / ops
+
+
+def time_games(games, max_turns):
+    start = time.perf_counter()
+    for seed in range(games):
+        play_game(seed, max_turns)
+    return (time.perf_counter() - start) / games
+
+
+def run(args):
+    """Returns {name: seconds per op}"""
+    corpus = make_corpus(args.corpus)
+    results = {}
+
+    def wanted(name):
+        return args.only is None or name in args.only
+
+    for name, bench in MICRO.items():
+        if wanted(name):
+            results[name] = time_micro(*bench(corpus), args.repeat)
+            print(f"{name:<30}{results[name] * 1e6:>14.2f} us/op")
+    for name, bench in MACRO.items():
+        if wanted(name):
+            results[name] = time_macro(*bench(corpus), args.macro_repeat)
+            print(f"{name:<30}{results[name] * 1e3:>14.2f} ms/op")
+    if wanted("game") and args.games > 0:
+        results["game"] = time_games(args.games, args.max_turns)
+        print(
+            f"{'game':<30}{1 / results['game']:>14.3f} games/s"
+            f" (max {args.max_turns} turns)"
+        )
+    return results
+
+
+def compare(results, baseline, threshold) -> bool:
+    """Prints the change against the baseline, returns False on a regression"""
+    ok = True
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        change = seconds / baseline[name] - 1
+        slower = change > threshold
+        ok = ok and not slower
+        flag = "  REGRESSION" if slower else ""
+        print(f"{name:<30}{change * 100:>+10.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game and AI hot paths")
+    parser.add_argument("--corpus", type=int, default=4, help="number of seeded boards")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per micro benchmark")
+    parser.add_argument("--macro-repeat", type=int, default=1)
+    parser.add_argument("--games", type=int, default=1, help="games for games/sec")
+    parser.add_argument("--max-turns", type=int, default=3, help="turn cap per game")
+    parser.add_argument(
+        "--only", nargs="+", choices=list(MICRO) + list(MACRO) + ["game"], metavar="NAME",
+        help="run only these benchmarks, by exact name: %(choices)s",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="overwrite the baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%"
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold * 100:.0f}%):")
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -366,5 +366,9 @@ class BlockBlast:
         row = rel_y // self.cell_size
         return (int(row), int(col))
 
+    def shape_id(self, block) -> int:
+        """Index of block in block_shapes + special_block_shapes"""
+        return (self.block_shapes + self.special_block_shapes).index(block)
+
     def get_deepcopy(self):
         return copy.deepcopy(self.grid)
@@ -0,0 +1,158 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import numpy as np
+from ai import FEATURE_NAMES
+from batch import play_game
+
+ARRAYS = {
+    # name -> (dtype, shape per position)
+    "board": (np.uint8, (8, 8)),  # 1 = occupied
+    "tray": (np.int8, (3,)),  # shape ids, -1 = already placed
+    "combo": (np.int16, ()),
+    "since_clear": (np.int16, ()),
+    "move": (np.int8, (3,)),  # block_i, row, col
+    "features": (np.float32, (len(FEATURE_NAMES),)),
+    "score": (np.int32, ()),  # score before the move
+    "score_to_go": (np.int32, ()),  # final score - score
+    "final_score": (np.int32, ()),
+    "game": (np.int32, ()),  # seed of the game
+}
+
+
+class DatasetWriter:
+    """Streams self-play positions to fixed-size shards on disk.
+
+    At most one shard plus the game in progress is held in memory. Shards are
+    either compressed `.npz` files or directories of `.npy` files that can be
+    memory-mapped.
+    """
+
+    def __init__(self, out_dir, shard_size=100_000, fmt="npz"):
+        if fmt not in ("npz", "npy"):
+            raise ValueError(f"Unknown format {fmt!r}, use 'npz' or 'npy'")
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.fmt = fmt
+        self.shards = 0
+        self.positions = 0
+        self._buffer = self._empty(shard_size)
+        self._filled = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    @staticmethod
+    def _empty(n):
+        return {
+            name: np.empty((n,) + shape, dtype=dtype)
+            for name, (dtype, shape) in ARRAYS.items()
+        }
+
+    def add_game(self, records, final_score, seed):
+        """Append one finished game; records are dicts keyed like ARRAYS"""
+        for record in records:
+            i = self._filled
+            for name in ("board", "tray", "combo", "since_clear", "move", "features", "score"):
+                self._buffer[name][i] = record[name]
+            self._buffer["score_to_go"][i] = final_score - record["score"]
+            self._buffer["final_score"][i] = final_score
+            self._buffer["game"][i] = seed
+            self._filled += 1
+            if self._filled == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        if self._filled == 0:
+            return
+        arrays = {name: a[: self._filled] for name, a in self._buffer.items()}
+        path = os.path.join(self.out_dir, f"shard_{self.shards:05d}")
+        if self.fmt == "npz":
+            np.savez_compressed(path + ".npz", **arrays)
+        else:
+            os.makedirs(path, exist_ok=True)
+            for name, a in arrays.items():
+                np.save(os.path.join(path, name + ".npy"), a)
+        self.shards += 1
+        self.positions += self._filled
+        self._filled = 0
+
+    def close(self):
+        self.flush()
+        with open(os.path.join(self.out_dir, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "format": self.fmt,
+                    "shards": self.shards,
+                    "positions": self.positions,
+                    "features": FEATURE_NAMES,
+                },
+                f,
+                indent=2,
+            )
+
+
+def iter_shards(data_dir):
+    """Yields one {name: array} dict per shard; `.npy` shards are memory-mapped"""
+    with open(os.path.join(data_dir, "meta.json")) as f:
+        meta = json.load(f)
+    for i in range(meta["shards"]):
+        path = os.path.join(data_dir, f"shard_{i:05d}")
+        if meta["format"] == "npz":
+            with np.load(path + ".npz") as shard:
+                yield {name: shard[name] for name in shard.files}
+        else:
+            yield {
+                name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+                for name in ARRAYS
+            }
+
+
+def record_position(game):
+    """Snapshot an AIBlockBlast just before its next move is made"""
+    return {
+        "board": [[cell != game.grid_bg_colour for cell in row] for row in game.grid],
+        "tray": [
+            -1 if placed else game.shape_id(block)
+            for (block, _), placed in zip(game.current_blocks, game.placed_preview)
+        ],
+        "combo": game.combo,
+        "since_clear": game.since_clear,
+        "move": game.moves[0],
+        "features": game.ai.get_features(game.grid, game.combo, game.since_clear),
+        "score": game.score,
+    }
+
+
+def export_self_play(writer, games, seed=0, max_turns=None):
+    for i in range(games):
+        records = []
+        score, _ = play_game(
+            seed + i, max_turns, on_move=lambda game: records.append(record_position(game))
+        )
+        writer.add_game(records, score, seed + i)
+        print(f"game {i} (seed {seed + i}): score {score}, {len(records)} positions")
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export self-play positions for training")
+    parser.add_argument("out_dir")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-turns", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=100_000, help="positions per shard")
+    parser.add_argument(
+        "--format", choices=["npz", "npy"], default="npz",
+        help="compressed .npz, or .npy directories that can be memory-mapped",
+    )
+    args = parser.parse_args()
+
+    writer = DatasetWriter(args.out_dir, args.shard_size, args.format)
+    export_self_play(writer, args.games, args.seed, args.max_turns)
+    print(f"{writer.positions} positions in {writer.shards} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import os
+import numpy as np
+
+
+class HeuristicEvaluator:
+    """Scores boards with the handcrafted BlockBlastAI.evaluate_board_state"""
+
+    def evaluate_batch(self, ai, grids, combos, since_clears):
+        return [
+            ai.evaluate_board_state(grid, combo, since_clear)
+            for grid, combo, since_clear in zip(grids, combos, since_clears)
+        ]
+
+    def fingerprint(self) -> bytes:
+        """32-byte id, equal for evaluators that score boards the same way"""
+        return hashlib.sha256(b"heuristic").digest()
+
+
+class MLPEvaluator:
+    """Small pure NumPy model scoring all candidate boards in one pass.
+
+    The input row is the heuristic features (FEATURE_NAMES) followed by the
+    flattened board occupancy, or only the occupancy when the first layer has
+    one input per cell. Feature inputs still run the Python heuristics
+    (mostly calculate_future_viability) for every candidate, so such a model
+    is never faster than HeuristicEvaluator; occupancy-only models skip them.
+    With a single layer the model is linear. Layers are (W, b) pairs with
+    ReLU between them.
+    """
+
+    def __init__(self, layers):
+        self.layers = [
+            (np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32))
+            for w, b in layers
+        ]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            n = len([key for key in f.files if key.startswith("W")])
+            return cls([(f[f"W{i}"], f[f"b{i}"]) for i in range(n)])
+
+    def save(self, path):
+        arrays = {}
+        for i, (w, b) in enumerate(self.layers):
+            arrays[f"W{i}"] = w
+            arrays[f"b{i}"] = b
+        np.savez(path, **arrays)
+
+    def fingerprint(self) -> bytes:
+        """32-byte id, equal for evaluators that score boards the same way"""
+        h = hashlib.sha256(b"mlp")
+        for w, b in self.layers:
+            h.update(repr((w.shape, b.shape)).encode())
+            h.update(w.tobytes())
+            h.update(b.tobytes())
+        return h.digest()
+
+    def inputs(self, ai, grids, combos, since_clears):
+        bg = ai.game.grid_bg_colour
+        board = np.array(
+            [[cell != bg for row in grid for cell in row] for grid in grids],
+            dtype=np.float32,
+        )
+        if self.layers[0][0].shape[0] == board.shape[1]:
+            return board
+        features = np.array(
+            [
+                ai.get_features(grid, combo, since_clear)
+                for grid, combo, since_clear in zip(grids, combos, since_clears)
+            ],
+            dtype=np.float32,
+        )
+        return np.hstack([features, board])
+
+    def forward(self, x):
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w + b
+            if i < len(self.layers) - 1:
+                x = np.maximum(x, 0)
+        return x[:, 0]
+
+    def evaluate_batch(self, ai, grids, combos, since_clears):
+        return self.forward(self.inputs(ai, grids, combos, since_clears)).tolist()
+
+
+def heuristic_layers(weights, n_board=64):
+    """Linear layer equivalent to evaluate_board_state for the given weights"""
+    w = [
+        weights["combo_multiplier"],
+        -2 * weights["combo_multiplier"],
+        weights["clear_bonus"],
+        weights["density_penalty"],
+        weights["edge_bonus"],
+        weights["future_viability"],
+        weights["complete_clear_bonus"],
+        1,  # clumping is added unweighted
+    ] + [0] * n_board
+    return [(np.array(w, dtype=np.float32)[:, None], np.zeros(1, dtype=np.float32))]
+
+
+def fit_linear(data_dir, l2=1e-3, occupancy_only=False):
+    """Ridge regression of score_to_go on the evaluator inputs of a dataset"""
+    from dataset import iter_shards
+
+    xtx = None
+    for shard in iter_shards(data_dir):
+        x = shard["board"].reshape(len(shard["board"]), -1).astype(np.float64)
+        if not occupancy_only:
+            x = np.hstack([shard["features"].astype(np.float64), x])
+        x = np.hstack([x, np.ones((len(x), 1))])
+        y = shard["score_to_go"].astype(np.float64)
+        if xtx is None:
+            xtx = np.zeros((x.shape[1], x.shape[1]))
+            xty = np.zeros(x.shape[1])
+        xtx += x.T @ x
+        xty += x.T @ y
+    if xtx is None:
+        raise ValueError(f"No positions in {data_dir}")
+
+    coef = np.linalg.solve(xtx + l2 * np.eye(len(xtx)), xty)
+    return [(coef[:-1, None].astype(np.float32), coef[-1:].astype(np.float32))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create weight files for MLPEvaluator")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit = sub.add_parser("fit", help="fit a linear model on an exported dataset")
+    fit.add_argument("data_dir")
+    fit.add_argument("out")
+    fit.add_argument("--l2", type=float, default=1e-3)
+    fit.add_argument(
+        "--occupancy-only", action="store_true",
+        help="use only the board cells as inputs, skipping the heuristics at inference",
+    )
+    heuristic = sub.add_parser("heuristic", help="linear weights matching the handcrafted heuristics")
+    heuristic.add_argument("out")
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        layers = fit_linear(args.data_dir, args.l2, args.occupancy_only)
+    else:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from ai import BlockBlastAI
+        from blockblast import BlockBlast
+
+        layers = heuristic_layers(BlockBlastAI(BlockBlast()).weights)
+    MLPEvaluator(layers).save(args.out)
+    print(f"Weights written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,27 @@ from ai import main_ai
 from player import main_player
 import sys
 
+USAGE = "Usage: python main.py [ai [--profile] [--weights FILE] | player]"
+
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         arg = sys.argv[1].lower()
         if arg == "ai":
+            args = sys.argv[2:]
+            weights = None
+            if "--weights" in args:
+                i = args.index("--weights") + 1
+                if i >= len(args) or args[i].startswith("--"):
+                    print(USAGE)
+                    sys.exit(1)
+                weights = args[i]
             print("Running AI mode...")
-            main_ai()
+            main_ai(profile="--profile" in args, weights=weights)
         elif arg == "player":
             print("Running Player mode...")
             main_player()
         else:
             print("Invalid argument. Use 'ai' or 'player'.")
     else:
-        print("Usage: python main.py [ai|player]")
\ No newline at end of file
+        print(USAGE)
\ No newline at end of file
@@ -0,0 +1,130 @@
+import json
+import time
+from typing import Dict, List, Optional
+
+
+class Profiler:
+    """Opt-in call counter and timer for the AI hot paths.
+
+    Methods are wrapped on the instances passed to `attach`, so nothing is
+    patched (and nothing costs anything) unless profiling is turned on.
+    """
+
+    def __init__(self, turn_phase: str = "find_best_move_sequence"):
+        self.turn_phase = turn_phase
+        self.totals: Dict[str, List[float]] = {}  # phase -> [calls, seconds]
+        self.turns: List[Dict[str, List[float]]] = []
+        self.folded: Dict[str, float] = {}  # "a;b;c" -> self seconds
+        self._stack = []  # [phase, start, child_seconds]
+        self._turn: Optional[Dict[str, List[float]]] = None
+
+    ########################################################################
+    # INSTRUMENTATION
+
+    def attach(self, ai):
+        """Instrument a BlockBlastAI, its evaluator and the game it plays on"""
+        for name in (
+            "find_best_move_sequence",
+            "evaluate_move_sequence",
+            "simulate_move",
+            "evaluate_board_state",
+            "analyze_clear_potential",
+            "calculate_density",
+            "calculate_edge_utilization",
+            "calculate_future_viability",
+            "calculate_clumping_score",
+        ):
+            self.instrument(ai, name)
+        # the evaluator may be shared across games, so wrap it per AI instead
+        ai.evaluator = _ProfiledEvaluator(ai.evaluator)
+        self.instrument(ai.evaluator, "evaluate_batch")
+        self.instrument(ai.game, "can_place_block")
+
+    def instrument(self, obj, name, phase=None):
+        func = getattr(obj, name)
+        phase = phase or name
+
+        def wrapper(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+
+        setattr(obj, name, wrapper)
+
+    def _enter(self, phase):
+        if phase == self.turn_phase and self._turn is None:
+            self._turn = {}
+        self._stack.append([phase, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        phase, start, child = self._stack[-1]
+        elapsed = time.perf_counter() - start
+        key = ";".join(frame[0] for frame in self._stack)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+        self._record(self.totals, phase, elapsed)
+        if self._turn is not None:
+            self._record(self._turn, phase, elapsed)
+        self.folded[key] = self.folded.get(key, 0.0) + elapsed - child
+
+        if phase == self.turn_phase and not any(
+            frame[0] == self.turn_phase for frame in self._stack
+        ):
+            self.turns.append(self._turn)
+            self._turn = None
+
+    @staticmethod
+    def _record(table, phase, elapsed):
+        entry = table.setdefault(phase, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    ########################################################################
+    # EXPORT
+
+    def to_dict(self):
+        def phases(table):
+            return {
+                phase: {"calls": calls, "seconds": seconds}
+                for phase, (calls, seconds) in sorted(
+                    table.items(), key=lambda item: -item[1][1]
+                )
+            }
+
+        return {
+            "totals": phases(self.totals),
+            "turns": [phases(turn) for turn in self.turns],
+        }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_folded(self, path):
+        """Write collapsed stacks (microseconds) for flamegraph.pl / speedscope"""
+        with open(path, "w") as f:
+            for key, seconds in sorted(self.folded.items()):
+                f.write(f"{key} {max(0, round(seconds * 1e6))}\n")
+
+    def summary(self) -> str:
+        lines = [f"{'phase':<30}{'calls':>12}{'seconds':>12}"]
+        for phase, stats in self.to_dict()["totals"].items():
+            lines.append(f"{phase:<30}{stats['calls']:>12}{stats['seconds']:>12.3f}")
+        return "\n".join(lines)
+
+
+class _ProfiledEvaluator:
+    """Per-AI stand-in for an evaluator, so instrumenting it leaves the original untouched"""
+
+    def __init__(self, evaluator):
+        self._evaluator = evaluator
+
+    def evaluate_batch(self, ai, grids, combos, since_clears):
+        return self._evaluator.evaluate_batch(ai, grids, combos, since_clears)
+
+    def __getattr__(self, name):
+        return getattr(self._evaluator, name)
@@ -0,0 +1,91 @@
+import os
+import random
+import struct
+
+# magic, occupancy bitboard, 2-bit colour plane, tray shape ids, tray colour ids,
+# placed flags, score, combo, since_clear, pending move count, pending moves
+# (block_i, row, col) x 3, Mersenne Twister state (624 words + index),
+# has gauss_next, gauss_next
+RECORD = struct.Struct("<4sQ16s3B3BBqHHB9B625I?d")
+MAGIC = b"BBS1"
+
+
+def serialize(game) -> bytes:
+    """Packs a full game, its pending AI moves and the global RNG into RECORD.size bytes"""
+    bitboard = 0
+    colours = bytearray(16)
+    for i, cell in enumerate(cell for row in game.grid for cell in row):
+        if cell == game.grid_bg_colour:
+            continue
+        bitboard |= 1 << i
+        colours[i // 4] |= game.block_colours.index(cell) << (2 * (i % 4))
+
+    shapes = [game.shape_id(block) for block, _ in game.current_blocks]
+    tray_colours = [game.block_colours.index(colour) for _, colour in game.current_blocks]
+    placed = sum(1 << i for i, p in enumerate(game.placed_preview) if p)
+
+    moves = list(getattr(game, "moves", None) or [])
+    flat_moves = [v for move in moves for v in move] + [0] * (9 - 3 * len(moves))
+
+    version, mt, gauss_next = random.getstate()
+    if version != 3 or len(mt) != 625:
+        raise ValueError(f"Unsupported RNG state version {version}")
+
+    return RECORD.pack(
+        MAGIC,
+        bitboard,
+        bytes(colours),
+        *shapes,
+        *tray_colours,
+        placed,
+        game.score,
+        game.combo,
+        game.since_clear,
+        len(moves),
+        *flat_moves,
+        *mt,
+        gauss_next is not None,
+        gauss_next or 0.0,
+    )
+
+
+def deserialize(game, data: bytes):
+    """Restores a record from serialize into game and the global RNG"""
+    fields = RECORD.unpack(data)
+    if fields[0] != MAGIC:
+        raise ValueError("Not a Block Blast snapshot")
+    bitboard, colours = fields[1], fields[2]
+    shapes, tray_colours, placed = fields[3:6], fields[6:9], fields[9]
+    score, combo, since_clear, n_moves = fields[10:14]
+    flat_moves, mt = fields[14:23], fields[23:648]
+    has_gauss, gauss_next = fields[648:650]
+
+    size = game.grid_size
+    all_shapes = game.block_shapes + game.special_block_shapes
+    for i in range(size * size):
+        colour = game.grid_bg_colour
+        if bitboard >> i & 1:
+            colour = game.block_colours[colours[i // 4] >> (2 * (i % 4)) & 3]
+        game.grid[i // size][i % size] = colour
+
+    game.current_blocks = [
+        (all_shapes[s], game.block_colours[c]) for s, c in zip(shapes, tray_colours)
+    ]
+    game.placed_preview = [bool(placed >> i & 1) for i in range(3)]
+    game.score = score
+    game.combo = combo
+    game.since_clear = since_clear
+    if hasattr(game, "moves"):
+        game.moves = [tuple(flat_moves[3 * i : 3 * i + 3]) for i in range(n_moves)]
+
+    random.setstate((3, mt, gauss_next if has_gauss else None))
+
+
+def write_atomic(path, data: bytes):
+    """Writes to a temp file and renames it over path, so a crash never leaves a torn file"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,98 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import random
+import pytest
+from ai import BlockBlastAI, max_filled_rect
+from blockblast import BlockBlast
+
+SIZE = 8
+
+
+def maxrect(bars):
+    """Stack-based largest rectangle under a histogram, as originally used"""
+    stack = []
+    res = 0
+    for bar in bars + [-1]:
+
+        steps = 0
+        while stack and stack[-1][1] >= bar:
+            w, h = stack.pop()
+            steps += w
+            res = max(res, h * steps)
+        stack.append((steps + 1, bar))
+
+    return res
+
+
+def reference_max_rect(grid):
+    histo = [0] * SIZE
+    max_rect = 0
+    for i in range(SIZE):
+        for j in range(SIZE):
+            histo[j] = histo[j] + 1 if grid[i][j] else 0
+        max_rect = max(maxrect(histo), max_rect)
+    return max_rect
+
+
+def row_masks(grid):
+    return tuple(sum(cell << j for j, cell in enumerate(row)) for row in grid)
+
+
+def empty():
+    return [[0] * SIZE for _ in range(SIZE)]
+
+
+def single_cell():
+    grid = empty()
+    grid[3][5] = 1
+    return grid
+
+
+def full_row():
+    grid = empty()
+    grid[2] = [1] * SIZE
+    return grid
+
+
+def full_column():
+    grid = empty()
+    for row in grid:
+        row[6] = 1
+    return grid
+
+
+EDGE_BOARDS = {
+    "empty": (empty(), 0),
+    "full": ([[1] * SIZE for _ in range(SIZE)], SIZE * SIZE),
+    "single_cell": (single_cell(), 1),
+    "full_row": (full_row(), SIZE),
+    "full_column": (full_column(), SIZE),
+}
+
+
+@pytest.mark.parametrize("name", EDGE_BOARDS)
+def test_edge_boards(name):
+    grid, expected = EDGE_BOARDS[name]
+    assert reference_max_rect(grid) == expected
+    assert max_filled_rect(row_masks(grid)) == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_maxrect_on_random_boards(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        density = rng.random()
+        grid = [[int(rng.random() < density) for _ in range(SIZE)] for _ in range(SIZE)]
+        assert max_filled_rect(row_masks(grid)) == reference_max_rect(grid), grid
+
+
+def test_clumping_score_uses_game_colours():
+    game = BlockBlast()
+    ai = BlockBlastAI(game)
+    grid = game.get_deepcopy()
+    for r in range(2, 5):
+        for c in range(1, 4):
+            grid[r][c] = game.block_colours[(r + c) % len(game.block_colours)]
+    assert ai.calculate_clumping_score(grid) == 9 / (SIZE * SIZE)
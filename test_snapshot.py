@@ -0,0 +1,118 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import random
+import pytest
+import batch
+import snapshot
+from ai import AIBlockBlast
+from blockblast import BlockBlast
+
+
+class Crash(Exception):
+    pass
+
+
+def make_game():
+    """A game with coloured cells, special shapes in the tray and one block placed"""
+    random.seed(7)
+    game = AIBlockBlast(search=False)
+    for r, c in [(0, 0), (0, 1), (3, 4), (7, 7)]:
+        game.grid[r][c] = game.block_colours[(r + c) % len(game.block_colours)]
+    game.current_blocks = [
+        (game.special_block_shapes[2], game.block_colours[1]),
+        (game.block_shapes[7], game.block_colours[3]),
+        (game.special_block_shapes[7], game.block_colours[0]),
+    ]
+    game.placed_preview = [False, True, False]
+    game.score = 1234
+    game.combo = 3
+    game.since_clear = 2
+    game.moves = [(2, 5, 0), (0, 1, 2)]
+    random.gauss(0, 1)  # leaves gauss_next set
+    return game
+
+
+def test_round_trip():
+    game = make_game()
+    rng_state = random.getstate()
+    assert rng_state[2] is not None
+    data = snapshot.serialize(game)
+    assert len(data) == snapshot.RECORD.size
+
+    random.seed(99)
+    restored = AIBlockBlast(search=False)
+    snapshot.deserialize(restored, data)
+
+    assert restored.grid == game.grid
+    assert restored.current_blocks == game.current_blocks
+    assert restored.placed_preview == game.placed_preview
+    assert (restored.score, restored.combo, restored.since_clear) == (1234, 3, 2)
+    assert restored.moves == game.moves
+    assert random.getstate() == rng_state
+    assert snapshot.serialize(restored) == data
+
+
+def test_round_trip_without_gauss_or_moves():
+    random.seed(3)
+    game = BlockBlast()
+    data = snapshot.serialize(game)
+
+    random.gauss(0, 1)
+    restored = BlockBlast()
+    snapshot.deserialize(restored, data)
+
+    assert restored.grid == game.grid
+    assert restored.current_blocks == game.current_blocks
+    assert random.getstate()[2] is None
+    assert snapshot.serialize(restored) == data
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        snapshot.deserialize(BlockBlast(), b"XXXX" + bytes(snapshot.RECORD.size - 4))
+
+
+def crash_after_first_save(monkeypatch):
+    save = batch.save_checkpoint
+
+    def crashing_save(*args, **kwargs):
+        save(*args, **kwargs)
+        raise Crash
+
+    monkeypatch.setattr(batch, "save_checkpoint", crashing_save)
+
+
+def game_lines(out):
+    return [line for line in out.splitlines() if line.startswith("game ")]
+
+
+@pytest.mark.parametrize(
+    "games, max_turns, resume_at",
+    [
+        (2, 1, "game 1, turn 0"),  # crash after the first game's checkpoint
+        (1, 2, "game 0, turn 1"),  # crash after the checkpoint at turn 1, mid-game
+    ],
+)
+def test_resume_matches_uninterrupted_run(
+    tmp_path, monkeypatch, capsys, games, max_turns, resume_at
+):
+    path = str(tmp_path / "run.ckpt")
+    expected, _ = batch.run_games(games, 0, max_turns)
+    expected_lines = game_lines(capsys.readouterr().out)
+
+    with monkeypatch.context() as m:
+        crash_after_first_save(m)
+        with pytest.raises(Crash):
+            batch.run_games(games, 0, max_turns, checkpoint=path, checkpoint_every=1)
+    assert os.path.exists(path)
+    before_crash = game_lines(capsys.readouterr().out)
+
+    random.seed(12345)  # the checkpoint must restore the RNG, not rely on it
+    resumed, _ = batch.run_games(games, 0, max_turns, checkpoint=path, checkpoint_every=1)
+    out = capsys.readouterr().out
+    assert f"resuming at {resume_at}" in out
+    assert before_crash + game_lines(out) == expected_lines
+    assert resumed == expected
+    assert not os.path.exists(path)